@@ -88,6 +88,30 @@ fn validate_dot_address(addr: &str) -> Result<(), String> {
     Err(format!("Invalid DOT address: {:.10}...", addr))
 }
 
+// Base58 alphabet lookup table (no 0, O, I or l), built at compile time
+const BASE58: [u8; 256] = {
+    let alphabet = b"123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz";
+    let mut table = [0u8; 256];
+    let mut i = 0;
+    while i < alphabet.len() {
+        table[alphabet[i] as usize] = 1;
+        i += 1;
+    }
+    table
+};
+
+// Transparent addresses only (P2PKH `D`, cold-staking `S`, P2SH `6`), as
+// indexed by the PIVX node's address index.
+// Called from the PIVX commands rather than validate_address, so wallets of
+// other PIVX formats (EXM, shield) can still be monitored.
+pub fn validate_pivx_address(addr: &str) -> Result<(), String> {
+    // One table load per byte, AND-reduced without early exit
+    if (addr.starts_with('D') || addr.starts_with('S') || addr.starts_with('6'))
+        && addr.len() >= 25 && addr.len() <= 35
+        && addr.bytes().fold(1u8, |ok, b| ok & BASE58[b as usize]) == 1 { return Ok(()); }
+    Err(format!("Invalid PIVX address: {:.10}...", addr))
+}
+
 pub fn validate_balance(balance: Option<f64>) -> Result<(), String> {
     if let Some(b) = balance {
         if b.is_nan() || b.is_infinite() { return Err("Invalid balance (NaN/Infinite)".to_string()); }
@@ -108,3 +132,46 @@ pub fn validate_setting_key(key: &str) -> Result<(), String> {
 pub fn validate_setting_value(value: &str) -> Result<(), String> {
     validate_string("Setting value", value, MAX_SETTING_VALUE_LEN)
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_pivx_address_valid() {
+        assert!(validate_pivx_address("DMJRSsuU9zfyrvxVaAEFQqK4MxZg6vgeS6").is_ok());
+        assert!(validate_pivx_address("SXw6tL9gVMoNqYFq2ZCDsfBqAQ6m8Uzwdn").is_ok());
+    }
+
+    #[test]
+    fn test_pivx_address_p2sh() {
+        assert!(validate_pivx_address("6NP8s3PKzzsKyfBpKHGeRwnHA3xN7gtXnv").is_ok());
+        assert!(validate_pivx_address("7NP8s3PKzzsKyfBpKHGeRwnHA3xN7gtXnv").is_err());
+    }
+
+    #[test]
+    fn test_pivx_address_excluded_chars() {
+        for c in ['0', 'O', 'I', 'l'] {
+            let addr = format!("DMJRSsuU9zfyrvxVaAEFQqK4MxZg6vge{}6", c);
+            assert!(validate_pivx_address(&addr).is_err(), "accepted '{}'", c);
+        }
+    }
+
+    #[test]
+    fn test_pivx_address_length_bounds() {
+        assert!(validate_pivx_address(&format!("D{}", "a".repeat(24))).is_ok());
+        assert!(validate_pivx_address(&format!("D{}", "a".repeat(34))).is_ok());
+        assert!(validate_pivx_address(&format!("D{}", "a".repeat(23))).is_err());
+        assert!(validate_pivx_address(&format!("D{}", "a".repeat(35))).is_err());
+    }
+
+    #[test]
+    fn test_pivx_address_non_ascii() {
+        assert!(validate_pivx_address("DMJRSsuU9zfyrvxVaAEFQqK4MxZg6vgéS").is_err());
+    }
+
+    #[test]
+    fn test_pivx_not_enforced_by_validate_address() {
+        assert!(validate_address("PIVX", "EXMxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx").is_ok());
+    }
+}
@@ -3919,6 +3919,8 @@ pub fn run() {
     tauri::Builder::default()
     .plugin(tauri_plugin_shell::init())
     .manage(SessionKeyState(Mutex::new(None)))  // 🔒 Session encryption key
+    .manage(PivxClientCache::default())          // 🪙 PIVX: clients RPC partagés
+    .manage(PivxBalanceCache::default())         // 🪙 PIVX: soldes récents (TTL 10 s)
     .setup(move |app| {
         // Set data directory from Tauri (works on all platforms including Android)
         if let Ok(dir) = app.path().app_local_data_dir() {
@@ -1,17 +1,35 @@
 // pivx_integration.rs - Intégration PIVX
+use base64::engine::general_purpose::STANDARD as BASE64;
+use base64::Engine;
+use reqwest::header::{HeaderMap, HeaderValue, AUTHORIZATION};
+use reqwest::StatusCode;
+use serde::de::DeserializeOwned;
 use serde::{Deserialize, Serialize};
+use serde_json::value::RawValue;
+use std::collections::{HashMap, HashSet};
+use std::future::Future;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex};
+use std::time::{Duration, Instant};
+use tauri::State;
+use tokio::sync::{mpsc, oneshot, watch, Semaphore};
 
 // Structures pour PIVX
 #[derive(Debug, Clone, Serialize, Deserialize)]
+#[serde(rename_all = "camelCase")]
 pub struct PivxNodeInfo {
     pub url: String,
     pub block_height: u64,
+    pub response_time: u64,
 }
 
+// Solde de l'adresse d'après l'index d'adresses du nœud. Le zPIV de
+// `getzerocoinbalance` appartient au wallet du nœud entier, pas à une adresse :
+// il n'est pas compté ici.
 #[derive(Debug, Clone, Serialize, Deserialize)]
+#[serde(rename_all = "camelCase")]
 pub struct PivxBalance {
     pub regular_balance: f64,
-    pub zpiv_balance: f64,
     pub total_balance: f64,
 }
 
@@ -23,47 +41,733 @@ pub struct PivxTransaction {
     pub time: u64,
 }
 
+#[derive(Debug, thiserror::Error)]
+pub enum PivxError {
+    #[error("Nœud PIVX inaccessible: {0}")]
+    Http(#[from] reqwest::Error),
+    #[error("Erreur RPC PIVX: {0}")]
+    Rpc(String),
+    #[error("Réponse JSON-RPC PIVX illisible: {0}")]
+    Json(#[from] serde_json::Error),
+    #[error("Réponse invalide du nœud PIVX")]
+    InvalidResponse,
+    #[error("Identifiants RPC PIVX invalides")]
+    InvalidCredentials,
+    #[error("Nœud PIVX: réponse HTTP {0}")]
+    HttpStatus(StatusCode),
+    #[error("{0}")]
+    Batch(String),
+}
+
+// Les commandes Tauri renvoient des String : `?` convertit directement
+impl From<PivxError> for String {
+    fn from(e: PivxError) -> String {
+        e.to_string()
+    }
+}
+
+#[derive(Debug, Serialize)]
+struct JsonRpcRequest<'a> {
+    jsonrpc: &'a str,
+    id: u64,
+    method: &'a str,
+    params: serde_json::Value,
+}
+
+#[derive(Debug, Deserialize)]
+struct JsonRpcError {
+    message: String,
+}
+
+// Réponse simple désérialisée directement dans le type attendu
+#[derive(Debug, Deserialize)]
+struct JsonRpcResponse<T> {
+    result: Option<T>,
+    error: Option<JsonRpcError>,
+}
+
+// Élément d'une réponse batch : le résultat reste brut jusqu'à ce que
+// l'appelant sache dans quel type le décoder
+#[derive(Debug, Deserialize)]
+struct BatchResponse {
+    id: u64,
+    result: Option<Box<RawValue>>,
+    error: Option<JsonRpcError>,
+}
+
+// Seuls les champs lus sont déclarés : serde saute les autres sans les allouer
+#[derive(Debug, Deserialize)]
+struct BlockchainInfo {
+    blocks: u64,
+}
+
+#[derive(Debug, Deserialize)]
+struct AddressBalance {
+    balance: i64,
+}
+
+// Entrée de `getaddressdeltas` (index d'adresses) : une par entrée ou sortie
+// touchant l'adresse, triées par hauteur. Le txid est emprunté au corps de la
+// réponse (hex, jamais d'échappement JSON).
+#[derive(Debug, Deserialize)]
+struct AddressDelta<'a> {
+    txid: &'a str,
+    satoshis: i64,
+}
+
+// Champs lus dans `getrawtransaction` verbeux ; hex, vin et vout sont ignorés
+#[derive(Debug, Deserialize)]
+struct RawTransactionInfo {
+    #[serde(default)]
+    confirmations: u32,
+    #[serde(default)]
+    time: u64,
+}
+
+const SATOSHIS_PER_PIV: f64 = 100_000_000.0;
+const DEFAULT_TRANSACTION_LIMIT: u32 = 10;
+// Première fenêtre de blocs lue dans l'index d'adresses (~1 semaine à 60 s
+// par bloc), doublée tant qu'elle ne contient pas `limit` transactions
+const DELTAS_WINDOW_BLOCKS: u64 = 10_080;
+// Chaque transaction coûte un getrawtransaction : borne la valeur venue de l'IPC
+const MAX_TRANSACTION_LIMIT: u32 = 100;
+
+// Nombre max d'appels par batch et fenêtre d'attente pour les regrouper
+const BATCH_MAX_CALLS: usize = 32;
+const BATCH_WINDOW: Duration = Duration::from_millis(5);
+// Batches envoyés en parallèle par client, bien sous la file de travail RPC
+// de pivxd (16 par défaut) qui répond HTTP 500 quand elle déborde
+const MAX_CONCURRENT_BATCHES: usize = 4;
+
+type RpcReply = oneshot::Sender<Result<Box<RawValue>, PivxError>>;
+
+struct QueuedCall {
+    method: &'static str,
+    params: serde_json::Value,
+    reply: RpcReply,
+}
+
+// Partie HTTP du client : le reqwest::Client est construit une seule fois et
+// réutilisé pour chaque appel, afin de garder les connexions TCP/TLS ouvertes
+struct RpcTransport {
+    client: reqwest::Client,
+    rpc_url: String,
+}
+
+impl RpcTransport {
+    // POST JSON-RPC commun aux appels simples et batch. Le nœud renvoie les
+    // erreurs RPC en HTTP 500 avec un corps JSON : seul un statut non-2xx
+    // sans JSON lisible devient une erreur HTTP.
+    async fn post<B: Serialize + ?Sized, T: DeserializeOwned>(&self, payload: &B) -> Result<T, PivxError> {
+        let response = self.client.post(&self.rpc_url).json(payload).send().await?;
+        let status = response.status();
+        if status == StatusCode::UNAUTHORIZED || status == StatusCode::FORBIDDEN {
+            return Err(PivxError::InvalidCredentials);
+        }
+
+        // bytes() + from_slice : une seule passe de validation UTF-8, pas de String
+        let body = response.bytes().await?;
+        serde_json::from_slice(&body).map_err(|e| {
+            if status.is_success() { PivxError::Json(e) } else { PivxError::HttpStatus(status) }
+        })
+    }
+
+    // Appel unique hors batch : Bytes -> T sans RawValue intermédiaire
+    async fn call<T: DeserializeOwned>(&self, method: &str, params: serde_json::Value) -> Result<T, PivxError> {
+        let rpc_request = JsonRpcRequest {
+            jsonrpc: "1.0",
+            id: 0,
+            method,
+            params,
+        };
+
+        let response: JsonRpcResponse<T> = self.post(&rpc_request).await?;
+        if let Some(error) = response.error {
+            return Err(PivxError::Rpc(error.message));
+        }
+        response.result.ok_or(PivxError::InvalidResponse)
+    }
+
+    // Envoie plusieurs appels dans un seul POST (batch JSON-RPC) et renvoie
+    // le résultat de chacun indexé par son id
+    async fn batch_call(
+        &self,
+        calls: Vec<(u64, &str, serde_json::Value)>,
+    ) -> Result<HashMap<u64, Result<Box<RawValue>, PivxError>>, PivxError> {
+        let batch: Vec<JsonRpcRequest> = calls
+            .into_iter()
+            .map(|(id, method, params)| JsonRpcRequest { jsonrpc: "1.0", id, method, params })
+            .collect();
+
+        let responses: Vec<BatchResponse> = self.post(&batch).await?;
+        Ok(responses
+            .into_iter()
+            .map(|resp| {
+                let result = match (resp.error, resp.result) {
+                    (Some(error), _) => Err(PivxError::Rpc(error.message)),
+                    (None, Some(raw)) => Ok(raw),
+                    (None, None) => Err(PivxError::InvalidResponse),
+                };
+                (resp.id, result)
+            })
+            .collect())
+    }
+
+    async fn dispatch(&self, calls: Vec<QueuedCall>) {
+        let mut replies = Vec::with_capacity(calls.len());
+        let batch = calls
+            .into_iter()
+            .enumerate()
+            .map(|(id, call)| {
+                replies.push(call.reply);
+                (id as u64, call.method, call.params)
+            })
+            .collect();
+
+        route_batch_results(replies, self.batch_call(batch).await);
+    }
+}
+
+fn queue_closed() -> PivxError {
+    PivxError::Batch("file d'appels RPC PIVX fermée".to_string())
+}
+
+// Renvoie à chaque appelant le résultat portant son id (sa position dans le
+// lot), quel que soit l'ordre des réponses ; un id absent est une erreur
+fn route_batch_results(
+    replies: Vec<RpcReply>,
+    results: Result<HashMap<u64, Result<Box<RawValue>, PivxError>>, PivxError>,
+) {
+    match results {
+        Ok(mut results) => {
+            for (id, reply) in replies.into_iter().enumerate() {
+                let result = results.remove(&(id as u64)).unwrap_or(Err(PivxError::InvalidResponse));
+                let _ = reply.send(result);
+            }
+        }
+        Err(e) => {
+            // Échec de transport : tous les appelants du lot reçoivent l'erreur
+            let msg = e.to_string();
+            for reply in replies {
+                let _ = reply.send(Err(PivxError::Batch(msg.clone())));
+            }
+        }
+    }
+}
+
+// Montant net (en satoshis) par transaction, de la plus récente à la plus
+// ancienne. `deltas` est trié par hauteur croissante, comme le renvoie
+// `getaddressdeltas` ; la troncature à `limit` vient après le regroupement.
+fn net_recent_transactions<'a>(deltas: &[AddressDelta<'a>], limit: usize) -> Vec<(&'a str, i64)> {
+    let mut net: Vec<(&str, i64)> = Vec::new();
+    let mut position: HashMap<&str, usize> = HashMap::new();
+    for delta in deltas.iter().rev() {
+        match position.get(delta.txid) {
+            Some(&i) => net[i].1 += delta.satoshis,
+            None => {
+                position.insert(delta.txid, net.len());
+                net.push((delta.txid, delta.satoshis));
+            }
+        }
+    }
+    net.truncate(limit);
+    net
+}
+
+// Tâche de fond : regroupe les appels arrivés dans la même fenêtre de 5 ms et
+// les envoie en un seul batch. S'arrête quand le PivxRpcClient est libéré.
+async fn run_batcher(transport: Arc<RpcTransport>, mut queue: mpsc::Receiver<QueuedCall>) {
+    let slots = Arc::new(Semaphore::new(MAX_CONCURRENT_BATCHES));
+    let mut pending = Vec::with_capacity(BATCH_MAX_CALLS);
+    while queue.recv_many(&mut pending, BATCH_MAX_CALLS).await > 0 {
+        tokio::time::sleep(BATCH_WINDOW).await;
+        while pending.len() < BATCH_MAX_CALLS {
+            match queue.try_recv() {
+                Ok(call) => pending.push(call),
+                Err(_) => break,
+            }
+        }
+
+        // Attend qu'un batch en cours se termine avant d'en lancer un autre
+        let Ok(slot) = slots.clone().acquire_owned().await else { break };
+        let calls = std::mem::replace(&mut pending, Vec::with_capacity(BATCH_MAX_CALLS));
+        let transport = transport.clone();
+        tauri::async_runtime::spawn(async move {
+            transport.dispatch(calls).await;
+            drop(slot);
+        });
+    }
+}
+
+// Client JSON-RPC PIVX : chaque appel passe par la file du batcher, de sorte
+// que les commandes lancées en parallèle par le front partagent un même POST
+pub struct PivxRpcClient {
+    // Identifie le couple (nœud, identifiants) du client, pour les caches
+    id: u64,
+    transport: Arc<RpcTransport>,
+    queue: mpsc::Sender<QueuedCall>,
+}
+
+impl PivxRpcClient {
+    pub fn new(
+        rpc_url: &str,
+        rpc_user: Option<&str>,
+        rpc_password: Option<&str>,
+    ) -> Result<Self, PivxError> {
+        // En-tête Authorization encodé une seule fois, puis ajouté par reqwest
+        // à chaque requête du client
+        let mut headers = HeaderMap::new();
+        if let Some(user) = rpc_user {
+            let credentials = format!("{}:{}", user, rpc_password.unwrap_or(""));
+            let mut auth = HeaderValue::from_str(&format!("Basic {}", BASE64.encode(credentials)))
+                .map_err(|_| PivxError::InvalidCredentials)?;
+            auth.set_sensitive(true);
+            headers.insert(AUTHORIZATION, auth);
+        }
+
+        let client = reqwest::Client::builder()
+            .default_headers(headers)
+            .timeout(Duration::from_secs(10))
+            .pool_idle_timeout(Some(Duration::from_secs(90)))
+            .pool_max_idle_per_host(8)
+            .tcp_keepalive(Some(Duration::from_secs(60)))
+            .build()?;
+
+        let transport = Arc::new(RpcTransport {
+            client,
+            rpc_url: rpc_url.to_string(),
+        });
+        let (queue, receiver) = mpsc::channel(256);
+        tauri::async_runtime::spawn(run_batcher(transport.clone(), receiver));
+
+        static NEXT_CLIENT_ID: AtomicU64 = AtomicU64::new(0);
+        let id = NEXT_CLIENT_ID.fetch_add(1, Ordering::Relaxed);
+        Ok(Self { id, transport, queue })
+    }
+
+    async fn call<T: DeserializeOwned>(&self, method: &'static str, params: serde_json::Value) -> Result<T, PivxError> {
+        let raw = self.call_raw(method, params).await?;
+        Ok(serde_json::from_str(raw.get())?)
+    }
+
+    // Résultat brut, pour les types qui empruntent au texte JSON
+    async fn call_raw(&self, method: &'static str, params: serde_json::Value) -> Result<Box<RawValue>, PivxError> {
+        let response = self.enqueue(method, params).await?;
+        response.await.map_err(|_| queue_closed())?
+    }
+
+    // Met tous les appels en file avant d'attendre le premier résultat, pour
+    // qu'ils partent dans le même batch
+    async fn call_many<T: DeserializeOwned>(
+        &self,
+        method: &'static str,
+        params: Vec<serde_json::Value>,
+    ) -> Result<Vec<T>, PivxError> {
+        let mut responses = Vec::with_capacity(params.len());
+        for params in params {
+            responses.push(self.enqueue(method, params).await?);
+        }
+
+        let mut results = Vec::with_capacity(responses.len());
+        for response in responses {
+            let raw = response.await.map_err(|_| queue_closed())??;
+            results.push(serde_json::from_str(raw.get())?);
+        }
+        Ok(results)
+    }
+
+    async fn enqueue(
+        &self,
+        method: &'static str,
+        params: serde_json::Value,
+    ) -> Result<oneshot::Receiver<Result<Box<RawValue>, PivxError>>, PivxError> {
+        let (reply, response) = oneshot::channel();
+        self.queue
+            .send(QueuedCall { method, params, reply })
+            .await
+            .map_err(|_| queue_closed())?;
+        Ok(response)
+    }
+
+    pub async fn test_connection(&self) -> Result<PivxNodeInfo, PivxError> {
+        // Test de nœud : appel direct, sans attendre la fenêtre du batcher.
+        // Instant est monotone, contrairement à SystemTime.
+        let start = Instant::now();
+        let info: BlockchainInfo = self.transport.call("getblockchaininfo", serde_json::json!([])).await?;
+
+        Ok(PivxNodeInfo {
+            url: self.transport.rpc_url.clone(),
+            block_height: info.blocks,
+            response_time: start.elapsed().as_millis() as u64,
+        })
+    }
+
+    pub async fn get_balance(&self, address: &str) -> Result<PivxBalance, PivxError> {
+        let address_balance: AddressBalance = self
+            .call("getaddressbalance", serde_json::json!([{ "addresses": [address] }]))
+            .await?;
+        let regular_balance = address_balance.balance as f64 / SATOSHIS_PER_PIV;
+
+        Ok(PivxBalance {
+            regular_balance,
+            total_balance: regular_balance,
+        })
+    }
+
+    // Historique via l'index d'adresses, comme get_balance : fonctionne pour
+    // toute adresse, sans qu'elle soit importée dans le wallet du nœud
+    pub async fn get_transactions(&self, address: &str, limit: u32) -> Result<Vec<PivxTransaction>, PivxError> {
+        let limit = limit as usize;
+        if limit == 0 {
+            return Ok(Vec::new());
+        }
+
+        // Lit l'historique par fenêtres de blocs en remontant depuis le sommet,
+        // au lieu de tout l'historique de l'adresse. Une transaction a une
+        // seule hauteur : les fenêtres ne la coupent jamais en deux.
+        let tip: u64 = self.call("getblockcount", serde_json::json!([])).await?;
+        let mut windows = Vec::new();
+        let mut found = 0;
+        let mut end = tip.max(1);
+        let mut span = DELTAS_WINDOW_BLOCKS;
+        loop {
+            // L'index refuse une hauteur de départ nulle
+            let start = end.saturating_sub(span - 1).max(1);
+            let raw = self
+                .call_raw(
+                    "getaddressdeltas",
+                    serde_json::json!([{ "addresses": [address], "start": start, "end": end }]),
+                )
+                .await?;
+            let deltas: Vec<AddressDelta> = serde_json::from_str(raw.get())?;
+            found += deltas.iter().map(|delta| delta.txid).collect::<HashSet<_>>().len();
+            windows.push(raw);
+            if found >= limit || start == 1 {
+                break;
+            }
+            end = start - 1;
+            span *= 2;
+        }
+
+        // Fenêtre la plus ancienne d'abord, pour garder l'ordre croissant
+        let mut deltas: Vec<AddressDelta> = Vec::new();
+        for raw in windows.iter().rev() {
+            deltas.extend(serde_json::from_str::<Vec<AddressDelta>>(raw.get())?);
+        }
+        let recent = net_recent_transactions(&deltas, limit);
+
+        let details: Vec<RawTransactionInfo> = self
+            .call_many(
+                "getrawtransaction",
+                recent.iter().map(|(txid, _)| serde_json::json!([txid, 1])).collect(),
+            )
+            .await?;
+
+        Ok(recent
+            .into_iter()
+            .zip(details)
+            .map(|((txid, satoshis), info)| PivxTransaction {
+                txid: txid.to_string(),
+                amount: satoshis as f64 / SATOSHIS_PER_PIV,
+                confirmations: info.confirmations,
+                time: info.time,
+            })
+            .collect())
+    }
+}
+
+// Clients PIVX partagés entre les commandes Tauri, un par nœud RPC et jeu
+// d'identifiants, pour que le pool de connexions survive d'un appel IPC à
+// l'autre. Deux wallets sur le même nœud avec des identifiants différents ont
+// chacun leur client au lieu de se l'arracher à chaque appel.
+type ClientKey = (String, Option<String>, Option<String>);
+
+#[derive(Default)]
+pub struct PivxClientCache(pub Mutex<HashMap<ClientKey, Arc<PivxRpcClient>>>);
+
+impl PivxClientCache {
+    pub fn get_or_create(
+        &self,
+        rpc_node: &str,
+        rpc_user: Option<String>,
+        rpc_password: Option<String>,
+    ) -> Result<Arc<PivxRpcClient>, String> {
+        let key = (rpc_node.to_string(), rpc_user, rpc_password);
+        let mut clients = self.0.lock().map_err(|e| e.to_string())?;
+        if let Some(client) = clients.get(&key) {
+            return Ok(client.clone());
+        }
+
+        let client = Arc::new(
+            PivxRpcClient::new(rpc_node, key.1.as_deref(), key.2.as_deref())?
+        );
+        clients.insert(key, client.clone());
+        Ok(client)
+    }
+}
+
+// Un bloc PIVX toutes les ~60 s : un solde de moins de 10 s reste exact
+const BALANCE_TTL: Duration = Duration::from_secs(10);
+
+// Issue d'une requête de solde en cours, partagée avec les appels concurrents
+// (succès comme erreur). `None` tant que la requête n'a pas abouti.
+type BalanceOutcome = Option<Result<PivxBalance, String>>;
+
+// (PivxRpcClient::id, adresse)
+type BalanceKey = (u64, String);
+
+pub enum BalanceFlight {
+    // Solde mis en cache entre-temps par une requête qui vient d'aboutir
+    Cached(PivxBalance),
+    // Premier appel pour la clé : fait la requête et publie son issue
+    Leader(watch::Sender<BalanceOutcome>),
+    // Appel concurrent : attend l'issue du premier
+    Waiter(watch::Receiver<BalanceOutcome>),
+}
+
+// Soldes récents par (client, adresse), pour ne pas refaire l'aller-retour
+// RPC à chaque rafraîchissement de l'UI. Le client représente le nœud et les
+// identifiants : un appel avec d'autres identifiants ne reçoit jamais un solde
+// obtenu avec ceux d'un autre wallet. `in_flight` garde un canal par clé
+// afin que des appels simultanés sur la même adresse reçoivent le résultat
+// d'une seule requête au lieu d'en lancer chacun une.
+#[derive(Default)]
+pub struct PivxBalanceCache {
+    balances: Mutex<HashMap<BalanceKey, (Instant, PivxBalance)>>,
+    in_flight: Mutex<HashMap<BalanceKey, watch::Receiver<BalanceOutcome>>>,
+}
+
+impl PivxBalanceCache {
+    pub fn get(&self, key: &BalanceKey) -> Option<PivxBalance> {
+        let balances = self.balances.lock().ok()?;
+        balances
+            .get(key)
+            .filter(|(fetched_at, _)| fetched_at.elapsed() < BALANCE_TTL)
+            .map(|(_, balance)| balance.clone())
+    }
+
+    pub fn insert(&self, key: BalanceKey, balance: PivxBalance) {
+        if let Ok(mut balances) = self.balances.lock() {
+            balances.retain(|_, (fetched_at, _)| fetched_at.elapsed() < BALANCE_TTL);
+            balances.insert(key, (Instant::now(), balance));
+        }
+    }
+
+    pub fn join_flight(&self, key: &BalanceKey) -> Result<BalanceFlight, String> {
+        let mut in_flight = self.in_flight.lock().map_err(|e| e.to_string())?;
+        // Le leader met en cache avant de retirer sa requête : vérifié sous ce
+        // verrou, un appel qui a raté le cache juste avant la fin de la requête
+        // trouve soit la requête en cours, soit le solde
+        if let Some(balance) = self.get(key) {
+            return Ok(BalanceFlight::Cached(balance));
+        }
+        if let Some(outcome) = in_flight.get(key) {
+            // Émetteur libéré sans publier : requête abandonnée, on la relance
+            if outcome.has_changed().is_ok() {
+                return Ok(BalanceFlight::Waiter(outcome.clone()));
+            }
+        }
+        let (leader, outcome) = watch::channel(None);
+        in_flight.insert(key.clone(), outcome);
+        Ok(BalanceFlight::Leader(leader))
+    }
+
+    // Appelé par le leader : met en cache un succès, retire la requête en
+    // cours puis réveille les appels en attente
+    pub fn finish_flight(
+        &self,
+        key: &BalanceKey,
+        leader: watch::Sender<BalanceOutcome>,
+        result: &Result<PivxBalance, String>,
+    ) {
+        if let Ok(balance) = result {
+            self.insert(key.clone(), balance.clone());
+        }
+        if let Ok(mut in_flight) = self.in_flight.lock() {
+            in_flight.remove(key);
+        }
+        leader.send_replace(Some(result.clone()));
+    }
+
+    // Solde en cache, ou issue d'une requête en cours pour la même clé, ou à
+    // défaut `fetch` exécuté une seule fois pour tous les appels concurrents
+    pub async fn get_or_fetch<F>(&self, key: &BalanceKey, fetch: F) -> Result<PivxBalance, String>
+    where
+        F: Future<Output = Result<PivxBalance, String>>,
+    {
+        if let Some(balance) = self.get(key) {
+            return Ok(balance);
+        }
+
+        let leader = match self.join_flight(key)? {
+            BalanceFlight::Cached(balance) => return Ok(balance),
+            BalanceFlight::Leader(leader) => leader,
+            BalanceFlight::Waiter(mut outcome) => {
+                let outcome = outcome
+                    .wait_for(Option::is_some)
+                    .await
+                    .map_err(|_| "Requête de solde PIVX interrompue".to_string())?;
+                return outcome.clone().unwrap_or_else(|| Err("Requête de solde PIVX interrompue".to_string()));
+            }
+        };
+
+        let result = fetch.await;
+        self.finish_flight(key, leader, &result);
+        result
+    }
+}
+
 #[tauri::command]
-pub async fn test_pivx_node(rpc_node: String) -> Result<PivxNodeInfo, String> {
-    Ok(PivxNodeInfo { 
-        url: rpc_node, 
-        block_height: 12345 
-    })
+pub async fn test_pivx_node(
+    clients: State<'_, PivxClientCache>,
+    rpc_node: String,
+    rpc_user: Option<String>,
+    rpc_password: Option<String>,
+) -> Result<PivxNodeInfo, String> {
+    let client = clients.get_or_create(&rpc_node, rpc_user, rpc_password)?;
+    client.test_connection().await.map_err(Into::into)
 }
 
 #[tauri::command]
 pub async fn get_pivx_balance(
-    _address: String,
-    _rpc_node: String,
-    _rpc_user: Option<String>,
-    _rpc_password: Option<String>,
+    clients: State<'_, PivxClientCache>,
+    balances: State<'_, PivxBalanceCache>,
+    address: String,
+    rpc_node: String,
+    rpc_user: Option<String>,
+    rpc_password: Option<String>,
 ) -> Result<PivxBalance, String> {
-    Ok(PivxBalance {
-        regular_balance: 10.5,
-        zpiv_balance: 5.2,
-        total_balance: 15.7,
-    })
+    crate::input_validation::validate_pivx_address(&address)?;
+    let client = clients.get_or_create(&rpc_node, rpc_user, rpc_password)?;
+    // L'adresse de la commande est déplacée dans la clé, puis empruntée
+    let key = (client.id, address);
+    balances
+        .get_or_fetch(&key, async { client.get_balance(&key.1).await.map_err(String::from) })
+        .await
 }
 
 #[tauri::command]
 pub async fn get_pivx_transactions(
-    _address: String,
-    _rpc_node: String,
-    _rpc_user: Option<String>,
-    _rpc_password: Option<String>,
+    clients: State<'_, PivxClientCache>,
+    address: String,
+    rpc_node: String,
+    rpc_user: Option<String>,
+    rpc_password: Option<String>,
+    limit: Option<u32>,
 ) -> Result<Vec<PivxTransaction>, String> {
-    Ok(vec![
-        PivxTransaction {
-            txid: "tx123".to_string(),
-            amount: 2.5,
-            confirmations: 6,
-            time: 1234567890,
-        },
-        PivxTransaction {
-            txid: "tx456".to_string(),
-            amount: 3.7,
-            confirmations: 12,
-            time: 1234567891,
-        }
-    ])
+    crate::input_validation::validate_pivx_address(&address)?;
+    let client = clients.get_or_create(&rpc_node, rpc_user, rpc_password)?;
+    let limit = limit.unwrap_or(DEFAULT_TRANSACTION_LIMIT).min(MAX_TRANSACTION_LIMIT);
+    Ok(client.get_transactions(&address, limit).await?)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::sync::atomic::AtomicUsize;
+
+    fn delta(txid: &str, satoshis: i64) -> AddressDelta<'_> {
+        AddressDelta { txid, satoshis }
+    }
+
+    #[test]
+    fn test_net_transactions_debit_and_credit() {
+        // Envoi de 1 PIV avec 0,2 PIV de monnaie rendue à la même adresse
+        let deltas = [delta("aa", -100_000_000), delta("aa", 20_000_000)];
+        assert_eq!(net_recent_transactions(&deltas, 10), vec![("aa", -80_000_000)]);
+    }
+
+    #[test]
+    fn test_net_transactions_newest_first() {
+        let deltas = [delta("aa", 5), delta("bb", 7), delta("cc", 9)];
+        assert_eq!(net_recent_transactions(&deltas, 10), vec![("cc", 9), ("bb", 7), ("aa", 5)]);
+    }
+
+    #[test]
+    fn test_net_transactions_truncates_after_dedup() {
+        let deltas = [delta("aa", 1), delta("bb", 2), delta("cc", 3), delta("cc", 4), delta("cc", 5)];
+        assert_eq!(net_recent_transactions(&deltas, 2), vec![("cc", 12), ("bb", 2)]);
+        assert!(net_recent_transactions(&deltas, 0).is_empty());
+    }
+
+    fn raw(json: &str) -> Box<RawValue> {
+        RawValue::from_string(json.to_string()).unwrap()
+    }
+
+    #[test]
+    fn test_batch_routing_out_of_order_and_missing_ids() {
+        let (replies, mut receivers): (Vec<_>, Vec<_>) = (0..3).map(|_| oneshot::channel()).unzip();
+        // Réponses dans le désordre, id 1 absent
+        let mut results = HashMap::new();
+        results.insert(2, Ok(raw("\"deux\"")));
+        results.insert(0, Ok(raw("\"zéro\"")));
+        route_batch_results(replies, Ok(results));
+
+        assert_eq!(receivers[0].try_recv().unwrap().unwrap().get(), "\"zéro\"");
+        assert!(matches!(receivers[1].try_recv().unwrap(), Err(PivxError::InvalidResponse)));
+        assert_eq!(receivers[2].try_recv().unwrap().unwrap().get(), "\"deux\"");
+    }
+
+    #[test]
+    fn test_batch_routing_transport_error() {
+        let (replies, mut receivers): (Vec<_>, Vec<_>) = (0..2).map(|_| oneshot::channel()).unzip();
+        route_batch_results(replies, Err(PivxError::InvalidResponse));
+        for receiver in receivers.iter_mut() {
+            assert!(matches!(receiver.try_recv().unwrap(), Err(PivxError::Batch(_))));
+        }
+    }
+
+    fn sample_balance() -> PivxBalance {
+        PivxBalance { regular_balance: 1.5, total_balance: 1.5 }
+    }
+
+    #[tokio::test]
+    async fn test_balance_single_flight() {
+        let cache = PivxBalanceCache::default();
+        let key = (0, "DMJRSsuU9zfyrvxVaAEFQqK4MxZg6vgeS6".to_string());
+        let fetches = AtomicUsize::new(0);
+        let fetch = || async {
+            fetches.fetch_add(1, Ordering::SeqCst);
+            tokio::time::sleep(Duration::from_millis(20)).await;
+            Ok(sample_balance())
+        };
+
+        let results = tokio::join!(
+            cache.get_or_fetch(&key, fetch()),
+            cache.get_or_fetch(&key, fetch()),
+            cache.get_or_fetch(&key, fetch()),
+            cache.get_or_fetch(&key, fetch()),
+        );
+        for result in [results.0, results.1, results.2, results.3] {
+            assert_eq!(result.unwrap().total_balance, 1.5);
+        }
+        assert_eq!(fetches.load(Ordering::SeqCst), 1);
+
+        // Appel qui a raté le cache juste avant que le leader ne termine
+        assert!(matches!(cache.join_flight(&key).unwrap(), BalanceFlight::Cached(_)));
+        assert!(cache.get_or_fetch(&key, fetch()).await.is_ok());
+        assert_eq!(fetches.load(Ordering::SeqCst), 1);
+    }
+
+    #[tokio::test]
+    async fn test_balance_single_flight_shares_errors() {
+        let cache = PivxBalanceCache::default();
+        let key = (0, "DMJRSsuU9zfyrvxVaAEFQqK4MxZg6vgeS6".to_string());
+        let fetches = AtomicUsize::new(0);
+        let fetch = || async {
+            fetches.fetch_add(1, Ordering::SeqCst);
+            tokio::time::sleep(Duration::from_millis(20)).await;
+            Err::<PivxBalance, _>("nœud injoignable".to_string())
+        };
+
+        let results = tokio::join!(
+            cache.get_or_fetch(&key, fetch()),
+            cache.get_or_fetch(&key, fetch()),
+            cache.get_or_fetch(&key, fetch()),
+        );
+        for result in [results.0, results.1, results.2] {
+            assert_eq!(result.unwrap_err(), "nœud injoignable");
+        }
+        assert_eq!(fetches.load(Ordering::SeqCst), 1);
+    }
 }
@@ -3,20 +3,79 @@
    Features: warm sky, golden sun, BLURRED CYBERPUNK CITY silhouette,
    rolling green hills reclaiming the city, Art Nouveau vines, solar panels,
    ferns, pollen particles.
+
+   Requires pycairo, numpy, scipy (city blur) and Pillow (PNG export).
 """
 import cairo
+import functools
 import math
+import os
 import random
-
-random.seed(42)
-
+import sys
+from collections import deque
+from itertools import starmap
+import numpy as np
+from PIL import Image
+from scipy.ndimage import gaussian_filter
+
+prng = random.Random(42)
+rng = np.random.default_rng(42)
+
+# DRAFT=1 renders at half resolution and upscales on export, for quick iteration.
+# All drawing uses the logical W x H coordinates; only the backing surfaces shrink.
+SCALE = 2 if os.environ.get('DRAFT') == '1' else 1
 W, H = 1800, 1200
-surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, W, H)
+# zlib level for the exported PNG: 1 is several times faster than libpng's
+# default 6 for a ~20% larger file, which is fine for a generated asset
+PNG_COMPRESS_LEVEL = int(os.environ.get('PNG_COMPRESS_LEVEL', '1'))
+PW, PH = W // SCALE, H // SCALE
+surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, PW, PH)
 ctx = cairo.Context(surface)
+ctx.scale(1 / SCALE, 1 / SCALE)
 
 def rgb(r, g, b, a=1.0):
     ctx.set_source_rgba(r/255, g/255, b/255, a)
 
+def sample_uniform(n, *bounds):
+    """Draw n uniform samples for each (lo, hi) pair in one rng call, one row per pair."""
+    lo, hi = np.array(bounds, dtype=np.float64).T
+    return rng.uniform(lo, hi, size=(n, len(bounds))).T
+
+def replay(method, rows):
+    """Call method(*row) for every row, with the loop driven from C.
+
+    pycairo has no bulk path constructor, so this is the cheapest way to push
+    long polylines: no Python-level loop body per vertex.
+    """
+    deque(starmap(method, rows), maxlen=0)
+
+def transform_points(pts, angle, dx, dy):
+    """Rotate (k, 2) points by angle, translate by (dx, dy); returns flat [x0, y0, x1, ...]."""
+    c, s = math.cos(angle), math.sin(angle)
+    xy = np.asarray(pts, dtype=np.float64) @ np.array([[c, s], [-s, c]]) + (dx, dy)
+    return xy.ravel().tolist()
+
+def quantize(values, lo, hi, levels=8):
+    """Snap values drawn from [lo, hi] to the centres of `levels` equal buckets."""
+    step = (hi - lo) / levels
+    return lo + (np.minimum((values - lo) // step, levels - 1) + 0.5) * step
+
+def fill_batched(rgba, emit):
+    """Emit shape i as a sub-path for every row of rgba, one fill per distinct colour."""
+    palette, keys = np.unique(rgba, axis=0, return_inverse=True)
+    keys = keys.ravel()
+    for key, colour in enumerate(palette.tolist()):
+        for i in np.flatnonzero(keys == key).tolist():
+            emit(i)
+        ctx.set_source_rgba(*colour)
+        ctx.fill()
+
+def emit_dot(xs, ys, rs):
+    def emit(i):
+        ctx.new_sub_path()
+        ctx.arc(xs[i], ys[i], rs[i], 0, 2 * math.pi)
+    return emit
+
 # ═══════════════════════════════════════════════════════
 # 1. WARM IVORY-GREEN SKY GRADIENT
 # ═══════════════════════════════════════════════════════
@@ -34,20 +93,46 @@ ctx.paint()
 # 2. GOLDEN SUNLIGHT — top right radial glow
 # ═══════════════════════════════════════════════════════
 sun_x, sun_y = W * 0.82, H * 0.08
-for i in range(8):
-    r = 500 - i * 30
-    alpha = 0.03 + i * 0.008
-    rad = cairo.RadialGradient(sun_x, sun_y, 0, sun_x, sun_y, r)
-    rad.add_color_stop_rgba(0, 1.0, 0.92, 0.5, alpha * 2.5)
-    rad.add_color_stop_rgba(0.4, 1.0, 0.88, 0.4, alpha * 1.5)
-    rad.add_color_stop_rgba(1.0, 1.0, 0.85, 0.3, 0)
-    ctx.set_source(rad)
-    ctx.paint()
+glow_r = 500
+
+def sun_glow_stops():
+    """Fold eight stacked radial glows (radius 500 - 30i) into one gradient's stops.
+
+    The layers are composited analytically ("over", premultiplied) at every
+    stop radius, so a single paint reproduces the stack.
+    """
+    layer_radii = [glow_r - i * 30 for i in range(8)]
+    radii = np.unique(np.concatenate([
+        np.linspace(0, glow_r, 26),
+        [r * t for r in layer_radii for t in (0.4, 1.0)],
+    ]))
+    colour = np.zeros((radii.size, 3))  # premultiplied
+    alpha = np.zeros(radii.size)
+    for i, r in enumerate(layer_radii):
+        la = 0.03 + i * 0.008
+        t = radii / r  # np.interp clamps past t=1, like cairo's EXTEND_PAD
+        a = np.interp(t, (0, 0.4, 1.0), (la * 2.5, la * 1.5, 0))
+        c = np.column_stack([np.interp(t, (0, 0.4, 1.0), ch)
+                             for ch in ((1.0, 1.0, 1.0), (0.92, 0.88, 0.85), (0.5, 0.4, 0.3))])
+        colour = c * a[:, None] + colour * (1 - a)[:, None]
+        alpha = a + alpha * (1 - a)
+    straight = np.divide(colour, alpha[:, None], out=np.ones_like(colour), where=alpha[:, None] > 0)
+    return zip((radii / glow_r).tolist(), straight.tolist(), alpha.tolist())
+
+glow = cairo.RadialGradient(sun_x, sun_y, 0, sun_x, sun_y, glow_r)
+for offset, (gr, gg, gb), ga in sun_glow_stops():
+    glow.add_color_stop_rgba(offset, gr, gg, gb, ga)
+ctx.save()
+ctx.rectangle(sun_x - glow_r, sun_y - glow_r, 2 * glow_r, 2 * glow_r)
+ctx.clip()
+ctx.set_source(glow)
+ctx.paint()
+ctx.restore()
 
 # Sun rays
 for i in range(24):
     angle = i * (2 * math.pi / 24) + 0.13
-    length = 350 + random.uniform(-80, 120)
+    length = 350 + prng.uniform(-80, 120)
     ctx.save()
     ctx.translate(sun_x, sun_y)
     ctx.rotate(angle)
@@ -78,212 +163,244 @@ ctx.stroke()
 # ═══════════════════════════════════════════════════════
 # Draw city onto a separate surface, then composite blurred
 
-city_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, W, H)
+city_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, PW, PH)
 cctx = cairo.Context(city_surface)
+cctx.scale(1 / SCALE, 1 / SCALE)
 
 horizon_y = H * 0.50  # city baseline
 
 # --- Generate building data ---
-buildings = []
-x = -20
-while x < W + 20:
-    btype = random.choice(['tower', 'tower', 'tower', 'dome', 'spire', 'block', 'antenna', 'megablock'])
-    bw = random.uniform(18, 55) if btype != 'megablock' else random.uniform(60, 110)
-
-    if btype == 'tower':
-        bh = random.uniform(80, 240)
-    elif btype == 'dome':
-        bh = random.uniform(50, 120)
-    elif btype == 'spire':
-        bh = random.uniform(150, 320)
-    elif btype == 'antenna':
-        bh = random.uniform(180, 350)
-    elif btype == 'megablock':
-        bh = random.uniform(60, 160)
-    else:
-        bh = random.uniform(40, 100)
-
-    buildings.append((x, bw, bh, btype))
-    x += bw * random.uniform(0.5, 1.1)
-
-def draw_city_silhouette(target_ctx, alpha_mult=1.0, offset_x=0, offset_y=0):
-    """Draw the full city skyline as silhouette shapes."""
-    # City color: dark blue-gray with slight purple (lunarpunk)
-    cr, cg, cb = 0.18, 0.20, 0.28
+def gen_buildings(width):
+    """Lay out the skyline left to right as (x, width, height, type) tuples."""
+    buildings = []
+    x = -20
+    while x < width + 20:
+        btype = prng.choice(['tower', 'tower', 'tower', 'dome', 'spire', 'block', 'antenna', 'megablock'])
+        bw = prng.uniform(18, 55) if btype != 'megablock' else prng.uniform(60, 110)
 
-    for bx, bw, bh, btype in buildings:
-        bx2 = bx + offset_x
-        by = horizon_y + offset_y
-        a = 0.22 * alpha_mult
+        if btype == 'tower':
+            bh = prng.uniform(80, 240)
+        elif btype == 'dome':
+            bh = prng.uniform(50, 120)
+        elif btype == 'spire':
+            bh = prng.uniform(150, 320)
+        elif btype == 'antenna':
+            bh = prng.uniform(180, 350)
+        elif btype == 'megablock':
+            bh = prng.uniform(60, 160)
+        else:
+            bh = prng.uniform(40, 100)
+
+        buildings.append((x, bw, bh, btype))
+        x += bw * prng.uniform(0.5, 1.1)
+    return buildings
+
+# Window glow palettes
+tower_windows = [
+    (0.85, 0.75, 0.35),  # warm yellow
+    (0.50, 0.70, 0.90),  # cool blue
+    (0.75, 0.50, 0.85),  # purple
+    (0.30, 0.80, 0.60),  # teal
+]
+megablock_windows = [
+    (0.85, 0.78, 0.40),
+    (0.45, 0.65, 0.90),
+    (0.70, 0.45, 0.80),
+]
+
+def polygon(*pts):
+    """Path ops for a closed polygon through pts."""
+    return [('move_to', pts[0])] + [('line_to', p) for p in pts[1:]] + [('close_path', ())]
+
+def circle(x, y, r):
+    return [('new_sub_path', ()), ('arc', (x, y, r, 0, 2 * math.pi))]
+
+@functools.lru_cache(maxsize=None)
+def solid_pattern(rgba):
+    return cairo.SolidPattern(*rgba)
+
+def paint_layers(target_ctx, layers, alpha_mult=1.0):
+    """Replay (kind, key, path ops) layers in order, one fill or stroke each.
+
+    key is the rgba for 'fill' layers and (rgba, line width) for 'stroke'
+    layers; alphas are scaled by alpha_mult when painting.
+    """
+    ops = {name: getattr(target_ctx, name)
+           for name in ('move_to', 'line_to', 'curve_to', 'close_path', 'new_sub_path', 'arc', 'rectangle')}
+    for kind, key, path in layers:
+        for op, args in path:
+            ops[op](*args)
+        if kind == 'fill':
+            target_ctx.set_source(solid_pattern((*key[:3], key[3] * alpha_mult)))
+            target_ctx.fill()
+        else:
+            rgba, width = key
+            target_ctx.set_source(solid_pattern((*rgba[:3], rgba[3] * alpha_mult)))
+            target_ctx.set_line_width(width)
+            target_ctx.stroke()
 
+def draw_windows(layers, cols, rows, lit_above, palette, alpha, ww, wh):
+    """Light a random subset of a facade's window grid, one fill per colour.
+
+    Windows of one facade never overlap, so batching them keeps the result
+    identical to filling each rectangle on its own.
+    """
+    wx, wy = np.meshgrid(np.asarray(cols), np.asarray(rows))
+    lit = rng.random(wx.shape) > lit_above
+    wx, wy = wx[lit], wy[lit]
+    colour_idx = rng.integers(0, len(palette), wx.size)
+    for ci, (r, g, b) in enumerate(palette):
+        sel = colour_idx == ci
+        if not sel.any():
+            continue
+        layers.append(('fill', (r, g, b, alpha), [('rectangle', (x0, y0, ww, wh))
+                                                  for x0, y0 in zip(wx[sel].tolist(), wy[sel].tolist())]))
+
+def build_city_paths(buildings, horizon_y):
+    """Precompute every skyline shape as ordered (kind, key, path ops) layers.
+
+    All randomness (tapers, roofs, dishes, lit windows) is resolved here, so
+    drawing is a pure replay of Cairo calls. Buildings overlap and their
+    translucent bodies must stack, so layers keep building order; only shapes
+    within one building that never overlap (windows, ribs, braces, terraces)
+    share a layer. Alphas are relative and get scaled by
+    draw_city_silhouette's alpha_mult.
+    """
+    # City color: dark blue-gray with slight purple (lunarpunk)
+    cr, cg, cb = 0.18, 0.20, 0.28
+    uniform, rand = prng.uniform, prng.random
+    # Loop invariants — every building shares the baseline and base alpha
+    by = horizon_y
+    a = 0.22
+    # Bucket keys, computed once instead of per building
+    body = (cr, cg, cb, a)
+    body_90, body_85, body_80 = (cr, cg, cb, a * 0.9), (cr, cg, cb, a * 0.85), (cr, cg, cb, a * 0.8)
+    rib = ((cr * 0.7, cg * 0.7, cb * 0.7, 0.08), 0.8)
+    terrace = ((cr * 0.8, cg * 0.8, cb * 0.8, 0.06), 1)
+    brace = ((cr, cg, cb, 0.12), 0.6)
+    dish = ((cr, cg, cb, 0.15), 1.5)
+    spire_tip = (0.80, 0.40, 0.40, 0.12)
+    beacon = (0.9, 0.3, 0.3, 0.15)
+    layers = []  # ('fill', rgba | 'stroke', (rgba, line width), path ops)
+
+    for bx2, bw, bh, btype in buildings:
         if btype == 'tower':
             # Rectangular tower with slight taper
-            taper = random.uniform(0.85, 0.98)
-            target_ctx.move_to(bx2, by)
-            target_ctx.line_to(bx2, by - bh)
-            target_ctx.line_to(bx2 + bw * taper, by - bh)
-            target_ctx.line_to(bx2 + bw, by)
-            target_ctx.close_path()
-            target_ctx.set_source_rgba(cr, cg, cb, a)
-            target_ctx.fill()
+            taper = uniform(0.85, 0.98)
+            layers.append(('fill', body, polygon(
+                (bx2, by), (bx2, by - bh), (bx2 + bw * taper, by - bh), (bx2 + bw, by))))
 
             # Roof detail — flat or pointed
-            if random.random() > 0.5:
+            if rand() > 0.5:
                 # Flat roof with antenna
-                target_ctx.move_to(bx2 + bw * 0.45, by - bh)
-                target_ctx.line_to(bx2 + bw * 0.48, by - bh - 20)
-                target_ctx.line_to(bx2 + bw * 0.52, by - bh - 20)
-                target_ctx.line_to(bx2 + bw * 0.55, by - bh)
-                target_ctx.close_path()
-                target_ctx.set_source_rgba(cr, cg, cb, a * 0.9)
-                target_ctx.fill()
+                layers.append(('fill', body_90, polygon(
+                    (bx2 + bw * 0.45, by - bh), (bx2 + bw * 0.48, by - bh - 20),
+                    (bx2 + bw * 0.52, by - bh - 20), (bx2 + bw * 0.55, by - bh))))
 
             # Window rows — tiny lit dots
-            for wy in range(int(by - bh + 15), int(by - 10), 14):
-                for wx in range(int(bx2 + 4), int(bx2 + bw - 4), 8):
-                    if random.random() > 0.4:
-                        # Warm window glow
-                        wr = random.choice([
-                            (0.85, 0.75, 0.35),  # warm yellow
-                            (0.50, 0.70, 0.90),  # cool blue
-                            (0.75, 0.50, 0.85),  # purple
-                            (0.30, 0.80, 0.60),  # teal
-                        ])
-                        target_ctx.set_source_rgba(wr[0], wr[1], wr[2], 0.06 * alpha_mult)
-                        target_ctx.rectangle(wx, wy, 3, 5)
-                        target_ctx.fill()
+            draw_windows(layers, range(int(bx2 + 4), int(bx2 + bw - 4), 8),
+                         range(int(by - bh + 15), int(by - 10), 14),
+                         0.4, tower_windows, 0.06, 3, 5)
 
         elif btype == 'dome':
             # Dome building
-            cx_d = bx2 + bw / 2
-            target_ctx.move_to(bx2, by)
-            target_ctx.line_to(bx2, by - bh * 0.5)
-            # dome arc
-            target_ctx.curve_to(bx2, by - bh, bx2 + bw, by - bh, bx2 + bw, by - bh * 0.5)
-            target_ctx.line_to(bx2 + bw, by)
-            target_ctx.close_path()
-            target_ctx.set_source_rgba(cr, cg, cb, a)
-            target_ctx.fill()
+            layers.append(('fill', body, [
+                ('move_to', (bx2, by)),
+                ('line_to', (bx2, by - bh * 0.5)),
+                # dome arc
+                ('curve_to', (bx2, by - bh, bx2 + bw, by - bh, bx2 + bw, by - bh * 0.5)),
+                ('line_to', (bx2 + bw, by)),
+                ('close_path', ()),
+            ]))
 
             # Dome ribs
+            ribs = []
             for ri in range(3):
                 rx = bx2 + bw * (0.25 + ri * 0.25)
-                target_ctx.move_to(rx, by)
                 rib_h = bh * (0.85 if ri == 1 else 0.7)
-                target_ctx.line_to(rx, by - rib_h)
-                target_ctx.set_source_rgba(cr * 0.7, cg * 0.7, cb * 0.7, 0.08 * alpha_mult)
-                target_ctx.set_line_width(0.8)
-                target_ctx.stroke()
+                ribs += [('move_to', (rx, by)), ('line_to', (rx, by - rib_h))]
+            layers.append(('stroke', rib, ribs))
 
         elif btype == 'spire':
             # Tall pointed spire — cathedral/transmission tower
-            target_ctx.move_to(bx2, by)
-            target_ctx.line_to(bx2 + bw * 0.15, by - bh * 0.6)
-            target_ctx.line_to(bx2 + bw * 0.35, by - bh * 0.65)
-            target_ctx.line_to(bx2 + bw * 0.5, by - bh)
-            target_ctx.line_to(bx2 + bw * 0.65, by - bh * 0.65)
-            target_ctx.line_to(bx2 + bw * 0.85, by - bh * 0.6)
-            target_ctx.line_to(bx2 + bw, by)
-            target_ctx.close_path()
-            target_ctx.set_source_rgba(cr, cg, cb, a)
-            target_ctx.fill()
+            layers.append(('fill', body, polygon(
+                (bx2, by), (bx2 + bw * 0.15, by - bh * 0.6), (bx2 + bw * 0.35, by - bh * 0.65),
+                (bx2 + bw * 0.5, by - bh), (bx2 + bw * 0.65, by - bh * 0.65),
+                (bx2 + bw * 0.85, by - bh * 0.6), (bx2 + bw, by))))
 
             # Spire tip light
-            target_ctx.arc(bx2 + bw * 0.5, by - bh, 2, 0, 2 * math.pi)
-            target_ctx.set_source_rgba(0.80, 0.40, 0.40, 0.12 * alpha_mult)
-            target_ctx.fill()
+            layers.append(('fill', spire_tip, circle(bx2 + bw * 0.5, by - bh, 2)))
 
         elif btype == 'antenna':
             # Thin lattice tower with dish
             mid = bx2 + bw * 0.5
-            target_ctx.move_to(mid - 3, by)
-            target_ctx.line_to(mid - 1.5, by - bh)
-            target_ctx.line_to(mid + 1.5, by - bh)
-            target_ctx.line_to(mid + 3, by)
-            target_ctx.close_path()
-            target_ctx.set_source_rgba(cr, cg, cb, a * 0.8)
-            target_ctx.fill()
+            layers.append(('fill', body_80, polygon(
+                (mid - 3, by), (mid - 1.5, by - bh), (mid + 1.5, by - bh), (mid + 3, by))))
 
             # Cross braces
-            for cb_y in range(int(by - bh + 30), int(by - 10), 35):
-                target_ctx.move_to(mid - 3, cb_y)
-                target_ctx.line_to(mid + 3, cb_y)
-                target_ctx.set_source_rgba(cr, cg, cb, 0.12 * alpha_mult)
-                target_ctx.set_line_width(0.6)
-                target_ctx.stroke()
+            layers.append(('stroke', brace, [
+                op for cb_y in range(int(by - bh + 30), int(by - 10), 35)
+                for op in (('move_to', (mid - 3, cb_y)), ('line_to', (mid + 3, cb_y)))]))
 
             # Satellite dish
-            dish_y = by - bh * random.uniform(0.55, 0.75)
-            target_ctx.arc(mid + 8, dish_y, 8, math.pi * 0.3, math.pi * 1.3)
-            target_ctx.set_source_rgba(cr, cg, cb, 0.15 * alpha_mult)
-            target_ctx.set_line_width(1.5)
-            target_ctx.stroke()
+            dish_y = by - bh * uniform(0.55, 0.75)
+            layers.append(('stroke', dish, [
+                ('new_sub_path', ()), ('arc', (mid + 8, dish_y, 8, math.pi * 0.3, math.pi * 1.3))]))
 
             # Blinking top light
-            target_ctx.arc(mid, by - bh, 2.5, 0, 2 * math.pi)
-            target_ctx.set_source_rgba(0.9, 0.3, 0.3, 0.15 * alpha_mult)
-            target_ctx.fill()
+            layers.append(('fill', beacon, circle(mid, by - bh, 2.5)))
 
         elif btype == 'megablock':
             # Wide brutalist megastructure with terraces
-            target_ctx.rectangle(bx2, by - bh, bw, bh)
-            target_ctx.set_source_rgba(cr, cg, cb, a * 0.9)
-            target_ctx.fill()
+            layers.append(('fill', body_90, [('rectangle', (bx2, by - bh, bw, bh))]))
 
             # Terraced setbacks
+            terraces = []
             for ti in range(3):
                 terrace_h = bh * (0.3 + ti * 0.2)
                 setback = bw * 0.08 * (ti + 1)
-                target_ctx.move_to(bx2 + setback, by - terrace_h)
-                target_ctx.line_to(bx2 + bw - setback, by - terrace_h)
-                target_ctx.set_source_rgba(cr * 0.8, cg * 0.8, cb * 0.8, 0.06 * alpha_mult)
-                target_ctx.set_line_width(1)
-                target_ctx.stroke()
+                terraces += [
+                    ('move_to', (bx2 + setback, by - terrace_h)),
+                    ('line_to', (bx2 + bw - setback, by - terrace_h))]
+            layers.append(('stroke', terrace, terraces))
 
             # Facade windows — grid
-            for wy in range(int(by - bh + 10), int(by - 5), 12):
-                for wx in range(int(bx2 + 5), int(bx2 + bw - 5), 10):
-                    if random.random() > 0.35:
-                        wr = random.choice([
-                            (0.85, 0.78, 0.40),
-                            (0.45, 0.65, 0.90),
-                            (0.70, 0.45, 0.80),
-                        ])
-                        target_ctx.set_source_rgba(wr[0], wr[1], wr[2], 0.04 * alpha_mult)
-                        target_ctx.rectangle(wx, wy, 4, 6)
-                        target_ctx.fill()
+            draw_windows(layers, range(int(bx2 + 5), int(bx2 + bw - 5), 10),
+                         range(int(by - bh + 10), int(by - 5), 12),
+                         0.35, megablock_windows, 0.04, 4, 6)
 
         else:  # block
-            target_ctx.rectangle(bx2, by - bh, bw, bh)
-            target_ctx.set_source_rgba(cr, cg, cb, a * 0.85)
-            target_ctx.fill()
+            layers.append(('fill', body_85, [('rectangle', (bx2, by - bh, bw, bh))]))
+
+    return layers
+
+def draw_city_silhouette(target_ctx, city_paths, alpha_mult=1.0, offset_x=0, offset_y=0):
+    """Draw the full city skyline as silhouette shapes, building by building."""
+    target_ctx.save()
+    target_ctx.translate(offset_x, offset_y)
+    paint_layers(target_ctx, city_paths, alpha_mult=alpha_mult)
+    target_ctx.restore()
+
+buildings = gen_buildings(W)
+city_paths = build_city_paths(buildings, horizon_y)
 
 # Draw city onto temp surface
-draw_city_silhouette(cctx, alpha_mult=1.0)
-
-# Save city layer for ImageMagick blur
-city_surface.write_to_png('/home/user/janus-monitor/src/assets/_city_layer.png')
-
-# Save base (no city) for compositing later
-surface.write_to_png('/home/user/janus-monitor/src/assets/_base_layer.png')
-
-# We'll composite the blurred city via ImageMagick after this script
-# For now, skip inline blur — ImageMagick will handle it
-import subprocess, sys
-
-# Apply real Gaussian blur to city layer
-subprocess.run([
-    'convert',
-    '/home/user/janus-monitor/src/assets/_city_layer.png',
-    '-blur', '0x8',
-    '/home/user/janus-monitor/src/assets/_city_blurred.png'
-], check=True)
-
-# Load blurred city back and composite onto main surface
-blurred_city = cairo.ImageSurface.create_from_png(
-    '/home/user/janus-monitor/src/assets/_city_blurred.png')
-ctx.set_source_surface(blurred_city, 0, 0)
+draw_city_silhouette(cctx, city_paths, alpha_mult=1.0)
+
+# Gaussian blur (sigma 8, like ImageMagick's `-blur 0x8`) done in place on the
+# city pixels. Premultiplied ARGB blurs correctly channel by channel.
+city_surface.flush()
+city_px = np.ndarray((PH, PW, 4), dtype=np.uint8, buffer=city_surface.get_data(),
+                     strides=(city_surface.get_stride(), 4, 1))
+city_px[:] = np.rint(gaussian_filter(city_px.astype(np.float32), sigma=(8 / SCALE, 8 / SCALE, 0)))
+city_surface.mark_dirty()
+
+# Pixel-space surfaces are composited 1:1 in device space
+ctx.save()
+ctx.identity_matrix()
+ctx.set_source_surface(city_surface, 0, 0)
 ctx.paint_with_alpha(0.85)
+ctx.restore()
 
 # Atmospheric haze over city — makes it look distant
 haze = cairo.LinearGradient(0, horizon_y - 350, 0, horizon_y + 40)
@@ -305,13 +422,13 @@ hills = [
     (H * 0.78, 0.30, (0.30, 0.52, 0.26)),
 ]
 
+hill_xs = np.arange(0, W + 50, 3, dtype=np.float64)
+
 for base_y, alpha, (hr, hg, hb) in hills:
+    phase = rng.uniform(0, 1, hill_xs.size)
+    hill_ys = base_y + np.sin(hill_xs * 0.003 + phase) * 35 + np.sin(hill_xs * 0.008) * 18
     ctx.move_to(0, base_y + 40)
-    x = 0
-    while x < W + 50:
-        cy = base_y + math.sin(x * 0.003 + random.uniform(0, 1)) * 35 + math.sin(x * 0.008) * 18
-        ctx.line_to(x, cy)
-        x += 3
+    replay(ctx.line_to, zip(hill_xs.tolist(), hill_ys.tolist()))
     ctx.line_to(W, H)
     ctx.line_to(0, H)
     ctx.close_path()
@@ -322,14 +439,14 @@ for base_y, alpha, (hr, hg, hb) in hills:
 # 5. ART NOUVEAU BOTANICAL BORDERS
 # ═══════════════════════════════════════════════════════
 def draw_vine(x_base, y_start, y_end, side='left', thickness=2.5):
-    points = []
-    y = y_start
-    while y < y_end:
-        offset = math.sin(y * 0.008) * 25 + math.sin(y * 0.02) * 12
-        if side == 'right':
-            offset = -offset
-        points.append((x_base + offset, y))
-        y += 3
+    sin, uniform = math.sin, prng.uniform
+    move_to, line_to, curve_to, stroke = ctx.move_to, ctx.line_to, ctx.curve_to, ctx.stroke
+    ys = np.arange(y_start, y_end, 3, dtype=np.float64)
+    offset = np.sin(ys * 0.008) * 25 + np.sin(ys * 0.02) * 12
+    if side == 'right':
+        offset = -offset
+    pts = np.column_stack([x_base + offset, ys])
+    points = pts.tolist()
 
     if len(points) < 2:
         return
@@ -337,56 +454,56 @@ def draw_vine(x_base, y_start, y_end, side='left', thickness=2.5):
     ctx.set_line_width(thickness)
     ctx.set_line_cap(cairo.LINE_CAP_ROUND)
     rgb(42, 100, 35, 0.55)
-    ctx.move_to(points[0][0], points[0][1])
-    for i in range(1, len(points) - 1, 2):
-        if i + 1 < len(points):
-            ctx.curve_to(points[i][0], points[i][1], points[i][0], points[i][1],
-                         points[i+1][0], points[i+1][1])
-    ctx.stroke()
+    move_to(points[0][0], points[0][1])
+    # Curve through every other point: (p[i], p[i], p[i+1]) for odd i
+    odd = np.arange(1, len(points) - 1, 2)
+    replay(curve_to, np.hstack([pts[odd], pts[odd], pts[odd + 1]]).tolist())
+    stroke()
 
     ctx.set_line_width(thickness * 0.5)
     rgb(58, 120, 42, 0.35)
     for i in range(0, len(points) - 4, 3):
         ox = 8 if side == 'left' else -8
-        ctx.move_to(points[i][0] + ox, points[i][1])
+        move_to(points[i][0] + ox, points[i][1])
         j = min(i + 4, len(points) - 1)
-        ctx.curve_to(
+        curve_to(
             points[i][0] + ox + 15 * (1 if side == 'left' else -1), points[i][1] + 20,
             points[j][0] + ox + 10 * (1 if side == 'left' else -1), points[j][1] - 15,
             points[j][0] + ox, points[j][1])
-        ctx.stroke()
+        stroke()
 
     for i in range(0, len(points) - 1, 18):
         px, py = points[i]
-        leaf_angle = math.sin(i * 0.1) * 0.5 + (0.3 if side == 'left' else 2.8)
-        leaf_size = 14 + random.uniform(-3, 6)
+        leaf_angle = sin(i * 0.1) * 0.5 + (0.3 if side == 'left' else 2.8)
+        leaf_size = 14 + uniform(-3, 6)
         ctx.save()
         ctx.translate(px, py)
         ctx.rotate(leaf_angle)
-        ctx.move_to(0, 0)
-        ctx.curve_to(leaf_size * 0.4, -leaf_size * 0.35, leaf_size * 0.8, -leaf_size * 0.15, leaf_size, 0)
-        ctx.curve_to(leaf_size * 0.8, leaf_size * 0.15, leaf_size * 0.4, leaf_size * 0.35, 0, 0)
-        gv = random.uniform(0.85, 1.15)
+        move_to(0, 0)
+        curve_to(leaf_size * 0.4, -leaf_size * 0.35, leaf_size * 0.8, -leaf_size * 0.15, leaf_size, 0)
+        curve_to(leaf_size * 0.8, leaf_size * 0.15, leaf_size * 0.4, leaf_size * 0.35, 0, 0)
+        gv = uniform(0.85, 1.15)
         ctx.set_source_rgba(0.22 * gv, 0.50 * gv, 0.18 * gv, 0.35)
         ctx.fill()
-        ctx.move_to(0, 0)
-        ctx.line_to(leaf_size * 0.9, 0)
+        move_to(0, 0)
+        line_to(leaf_size * 0.9, 0)
         rgb(35, 80, 28, 0.2)
         ctx.set_line_width(0.5)
-        ctx.stroke()
+        stroke()
         ctx.restore()
 
+    # Tendril spiral, relative to its anchor point
+    t = np.arange(30)
+    curl_dir = 1 if side == 'left' else -1
+    curl = np.column_stack([curl_dir * (t * 0.6 * np.cos(t * 0.25) + 8),
+                            -t * 0.6 * np.sin(t * 0.25) - 5])
     for i in range(0, len(points) - 1, 35):
         px, py = points[i]
-        curl_dir = 1 if side == 'left' else -1
         ctx.set_line_width(0.8)
         rgb(58, 110, 40, 0.25)
-        ctx.move_to(px, py)
-        for t in range(30):
-            ang = t * 0.25
-            r = t * 0.6
-            ctx.line_to(px + curl_dir * (r * math.cos(ang) + 8), py - r * math.sin(ang) - 5)
-        ctx.stroke()
+        move_to(px, py)
+        replay(line_to, (curl + (px, py)).tolist())
+        stroke()
 
 draw_vine(25, 50, H - 50, 'left', 3)
 draw_vine(15, 200, H - 100, 'left', 1.8)
@@ -396,30 +513,33 @@ draw_vine(W - 15, 250, H - 100, 'right', 1.8)
 # ═══════════════════════════════════════════════════════
 # 6. BOTTOM VEGETATION — lush fern carpet
 # ═══════════════════════════════════════════════════════
+# Control points are rotated/translated in numpy and emitted in device space,
+# so no per-fern save/translate/rotate/restore is needed.
 for i in range(60):
-    bx = random.uniform(-20, W + 20)
-    by = H - random.uniform(10, 120)
-    fern_h = random.uniform(30, 80)
-    lean = random.uniform(-0.3, 0.3)
-    ctx.save()
-    ctx.translate(bx, by)
-    ctx.rotate(lean)
-    g = random.uniform(0.3, 0.55)
-    ctx.set_source_rgba(0.15, g, 0.12, 0.3)
-    ctx.set_line_width(1.2)
-    ctx.move_to(0, 0)
-    ctx.curve_to(3, -fern_h * 0.3, -2, -fern_h * 0.6, 1, -fern_h)
-    ctx.stroke()
+    bx = prng.uniform(-20, W + 20)
+    by = H - prng.uniform(10, 120)
+    fern_h = prng.uniform(30, 80)
+    lean = prng.uniform(-0.3, 0.3)
+    g = prng.uniform(0.3, 0.55)
+    # Stem, then one (start, c1, c2, end) quadruple per frond
+    local = [(0, 0), (3, -fern_h * 0.3), (-2, -fern_h * 0.6), (1, -fern_h)]
     for j in range(int(fern_h / 8)):
         fy = -j * 8
         frond_len = (fern_h - j * 8) * 0.4
         side = 1 if j % 2 == 0 else -1
-        ctx.set_source_rgba(0.18, g * 1.1, 0.15, 0.22)
-        ctx.set_line_width(0.6)
-        ctx.move_to(0, fy)
-        ctx.curve_to(side * frond_len * 0.5, fy - 3, side * frond_len, fy - 1, side * frond_len, fy + 2)
+        local += [(0, fy), (side * frond_len * 0.5, fy - 3), (side * frond_len, fy - 1), (side * frond_len, fy + 2)]
+    pts = transform_points(local, lean, bx, by)
+    ctx.set_source_rgba(0.15, g, 0.12, 0.3)
+    ctx.set_line_width(1.2)
+    ctx.move_to(*pts[0:2])
+    ctx.curve_to(*pts[2:8])
+    ctx.stroke()
+    ctx.set_source_rgba(0.18, g * 1.1, 0.15, 0.22)
+    ctx.set_line_width(0.6)
+    for k in range(8, len(pts), 8):
+        ctx.move_to(*pts[k:k + 2])
+        ctx.curve_to(*pts[k + 2:k + 8])
         ctx.stroke()
-    ctx.restore()
 
 ground = cairo.LinearGradient(0, H - 80, 0, H)
 ground.add_color_stop_rgba(0, 0.25, 0.48, 0.22, 0)
@@ -518,32 +638,55 @@ ctx.restore()
 # ═══════════════════════════════════════════════════════
 # 9. FLOATING LEAVES + POLLEN
 # ═══════════════════════════════════════════════════════
-for i in range(35):
-    lx = random.uniform(60, W - 60)
-    ly = random.uniform(80, H * 0.55)
-    la = random.uniform(0, 2 * math.pi)
-    ls = random.uniform(8, 18)
-    ctx.save()
-    ctx.translate(lx, ly)
-    ctx.rotate(la)
-    ctx.move_to(0, 0)
-    ctx.curve_to(ls * 0.3, -ls * 0.25, ls * 0.7, -ls * 0.12, ls, 0)
-    ctx.curve_to(ls * 0.7, ls * 0.12, ls * 0.3, ls * 0.25, 0, 0)
-    g = random.uniform(0.35, 0.55)
-    ctx.set_source_rgba(0.18, g, 0.15, random.uniform(0.06, 0.15))
-    ctx.fill()
-    ctx.restore()
-
-for i in range(120):
-    px = random.uniform(0, W)
-    py = random.uniform(0, H * 0.85)
-    ps = random.uniform(0.8, 3.0)
-    if i % 3 == 0:
-        ctx.set_source_rgba(0.85, 0.72, 0.22, random.uniform(0.08, 0.25))
-    else:
-        ctx.set_source_rgba(0.35, random.uniform(0.45, 0.65), 0.28, random.uniform(0.06, 0.15))
-    ctx.arc(px, py, ps, 0, 2 * math.pi)
-    ctx.fill()
+# Every attribute of a particle set is drawn in a single rng call; colours are
+# quantized so every bucket is filled with a single ctx.fill().
+n_leaves = 35
+lx, ly, la, ls, leaf_g, leaf_a = sample_uniform(
+    n_leaves, (60, W - 60), (80, H * 0.55), (0, 2 * math.pi), (8, 18), (0.35, 0.55), (0.06, 0.15))
+leaf_rgba = np.column_stack([
+    np.full(n_leaves, 0.18),
+    quantize(leaf_g, 0.35, 0.55, 4),
+    np.full(n_leaves, 0.15),
+    quantize(leaf_a, 0.06, 0.15),
+])
+
+# All 35 leaves transformed at once: (n, 7, 2) control points -> (n, 14) rows
+leaf_template = np.array([(0, 0), (0.3, -0.25), (0.7, -0.12), (1, 0), (0.7, 0.12), (0.3, 0.25), (0, 0)])
+leaf_local = ls[:, None, None] * leaf_template
+lc, lsn = np.cos(la)[:, None], np.sin(la)[:, None]
+leaf_paths = np.stack([
+    lc * leaf_local[..., 0] - lsn * leaf_local[..., 1] + lx[:, None],
+    lsn * leaf_local[..., 0] + lc * leaf_local[..., 1] + ly[:, None],
+], axis=-1).reshape(n_leaves, -1).tolist()
+
+def emit_leaf(i):
+    p = leaf_paths[i]
+    ctx.move_to(p[0], p[1])
+    ctx.curve_to(*p[2:8])
+    ctx.curve_to(*p[8:14])
+
+fill_batched(leaf_rgba, emit_leaf)
+
+n_pollen = 120
+px, py, ps, gold_a, green_g, green_a = sample_uniform(
+    n_pollen, (0, W), (0, H * 0.85), (0.8, 3.0), (0.08, 0.25), (0.45, 0.65), (0.06, 0.15))
+gold = (np.arange(n_pollen) % 3 == 0)[:, None]
+pollen_rgba = np.where(
+    gold,
+    np.column_stack([
+        np.full(n_pollen, 0.85),
+        np.full(n_pollen, 0.72),
+        np.full(n_pollen, 0.22),
+        quantize(gold_a, 0.08, 0.25),
+    ]),
+    np.column_stack([
+        np.full(n_pollen, 0.35),
+        quantize(green_g, 0.45, 0.65, 4),
+        np.full(n_pollen, 0.28),
+        quantize(green_a, 0.06, 0.15),
+    ]),
+)
+fill_batched(pollen_rgba, emit_dot(px.tolist(), py.tolist(), ps.tolist()))
 
 # ═══════════════════════════════════════════════════════
 # 10. FRAME + TEXTURE
@@ -557,15 +700,46 @@ rgb(58, 110, 40, 0.06)
 ctx.rectangle(margin + 8, margin + 8, W - 2 * (margin + 8), H - 2 * (margin + 8))
 ctx.stroke()
 
-for i in range(3000):
-    tx = random.uniform(0, W)
-    ty = random.uniform(0, H)
-    ctx.set_source_rgba(0.5, 0.55, 0.4, random.uniform(0.01, 0.025))
-    ctx.arc(tx, ty, random.uniform(0.3, 1.2), 0, 2 * math.pi)
-    ctx.fill()
+# Film grain: a sparse noise field written straight into an ARGB32 buffer
+# and composited in one paint, instead of thousands of tiny arcs.
+grain_density = 3000 / (PW * PH)  # same dot count as the old per-arc loop
+noise = rng.random((PH, PW), dtype=np.float32)
+grain_alpha = np.where(noise < grain_density, 0.01 + 0.015 * noise / grain_density, 0.0)
+
+def premultiplied(channel):
+    return np.rint(grain_alpha * channel * 255).astype(np.uint32)
+
+# Cairo stores ARGB32 as native-endian 32-bit words, premultiplied
+grain_argb = (
+    (premultiplied(1.0) << 24) | (premultiplied(0.5) << 16)
+    | (premultiplied(0.55) << 8) | premultiplied(0.4)
+)
+grain = cairo.ImageSurface.create_for_data(grain_argb, cairo.FORMAT_ARGB32, PW, PH, PW * 4)
+ctx.save()
+ctx.identity_matrix()
+ctx.set_source_surface(grain, 0, 0)
+ctx.paint()
+ctx.restore()
 
 # ═══════════════════════════════════════════════════════
 # EXPORT
 # ═══════════════════════════════════════════════════════
-surface.write_to_png('/home/user/janus-monitor/src/assets/solarpunk_bg.png')
+if SCALE != 1:
+    # Upscale the draft render so the exported asset keeps its full size
+    full = cairo.ImageSurface(cairo.FORMAT_ARGB32, W, H)
+    fctx = cairo.Context(full)
+    fctx.scale(SCALE, SCALE)
+    fctx.set_source_surface(surface, 0, 0)
+    fctx.paint()
+    surface = full
+surface.flush()
+# Cairo's premultiplied native-endian ARGB32 is BGRa byte order on little-endian
+# hosts; Pillow un-premultiplies while decoding it. Big-endian hosts store the
+# same words as aRGB, which Pillow has no unpacker for, so swap each pixel.
+pixels = surface.get_data()
+if sys.byteorder == 'big':
+    pixels = np.frombuffer(pixels, np.uint8).reshape(-1, 4)[:, ::-1].tobytes()
+Image.frombuffer('RGBA', (surface.get_width(), surface.get_height()), pixels,
+                 'raw', 'BGRa', surface.get_stride(), 1).save(
+    '/home/user/janus-monitor/src/assets/solarpunk_bg.png', compress_level=PNG_COMPRESS_LEVEL)
 print("PNG saved -> solarpunk_bg.png")